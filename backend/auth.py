@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import time
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -10,6 +12,10 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Recently verified tokens -> (email, exp), so repeat requests with the same
+# token skip the signature check
+_token_cache = TTLCache(maxsize=10_000, ttl=60)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -28,11 +34,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_token(token: str):
+    cached = _token_cache.get(token)
+    if cached is not None:
+        email, expire = cached
+        if expire > time.time():
+            return email
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             return None
+        _token_cache[token] = (email, payload.get("exp", 0))
         return email
     except JWTError:
         return None
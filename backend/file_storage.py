@@ -1,10 +1,16 @@
+import asyncio
+import io
 import os
+import sys
 import uuid
-import aiofiles
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
 import shutil
 
+# Size of the slices uploads are copied in, so memory use stays flat
+# regardless of how long the recording is
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 class FileStorage:
     """
     File storage handler that can work with local storage or cloud storage
@@ -15,13 +21,16 @@ class FileStorage:
         self.base_path = Path(base_path)
         self.base_path.mkdir(exist_ok=True)
     
+    def _unique_filename(self, filename: str) -> str:
+        """Generate a unique filename keeping the original extension"""
+        file_extension = filename.split('.')[-1] if '.' in filename else 'wav'
+        return f"{uuid.uuid4()}.{file_extension}"
+    
     async def save_audio_file(self, audio_content: bytes, filename: str) -> str:
         """
         Save audio file and return the file path
         """
-        # Generate unique filename
-        file_extension = filename.split('.')[-1] if '.' in filename else 'wav'
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
+        unique_filename = self._unique_filename(filename)
         file_path = self.base_path / unique_filename
         
         if self.storage_type == "local":
@@ -32,10 +41,60 @@ class FileStorage:
         else:
             raise ValueError(f"Unsupported storage type: {self.storage_type}")
     
+    async def save_audio_fileobj(self, fileobj: BinaryIO, filename: str) -> str:
+        """
+        Copy an open audio file (e.g. an upload's spooled file) chunk by chunk
+        and return the file path
+        """
+        unique_filename = self._unique_filename(filename)
+        file_path = self.base_path / unique_filename
+        
+        if self.storage_type == "local":
+            return await self._save_local_fileobj(fileobj, file_path)
+        elif self.storage_type == "cloud":
+            return await self._save_cloud_fileobj(fileobj, unique_filename)
+        else:
+            raise ValueError(f"Unsupported storage type: {self.storage_type}")
+    
+    async def _save_local_fileobj(self, fileobj: BinaryIO, file_path: Path) -> str:
+        """Copy an open file to local storage"""
+        # The whole copy runs in one worker thread rather than hopping to the
+        # thread pool for every open/write/close call
+        await asyncio.to_thread(self._copy_fileobj, fileobj, file_path)
+        return str(file_path)
+    
+    def _copy_fileobj(self, fileobj: BinaryIO, file_path: Path) -> None:
+        size = fileobj.seek(0, os.SEEK_END)
+        fileobj.seek(0)
+        with open(file_path, 'wb') as f:
+            # Uploads over 1 MiB are already spooled to a temp file on disk:
+            # copy those in the kernel without passing through user space.
+            # Smaller ones may still be in memory, where fileno() would
+            # force them onto disk first.
+            in_fd = self._fileno(fileobj) if size > UPLOAD_CHUNK_SIZE else None
+            if in_fd is not None and sys.platform == "linux":
+                self._sendfile(in_fd, f.fileno())
+            else:
+                shutil.copyfileobj(fileobj, f, UPLOAD_CHUNK_SIZE)
+    
+    def _fileno(self, fileobj: BinaryIO) -> Optional[int]:
+        try:
+            return fileobj.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            return None
+    
+    def _sendfile(self, in_fd: int, out_fd: int) -> None:
+        size = os.fstat(in_fd).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    
     async def _save_local(self, audio_content: bytes, file_path: Path) -> str:
         """Save file locally"""
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(audio_content)
+        await asyncio.to_thread(file_path.write_bytes, audio_content)
         return str(file_path)
     
     async def _save_cloud(self, audio_content: bytes, filename: str) -> str:
@@ -53,6 +112,15 @@ class FileStorage:
         
         return local_path
     
+    async def _save_cloud_fileobj(self, fileobj: BinaryIO, filename: str) -> str:
+        """
+        Stream an open file to cloud storage
+        This is a placeholder - implement alongside _save_cloud
+        """
+        # For now, save locally like _save_cloud does. A real implementation
+        # would pass fileobj to the provider's streaming upload.
+        return await self._save_local_fileobj(fileobj, self.base_path / filename)
+    
     def get_file_url(self, file_path: str) -> str:
         """
         Get accessible URL for the file
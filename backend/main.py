@@ -1,26 +1,75 @@
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 import os
 import uuid
-import aiofiles
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+from contextlib import asynccontextmanager
+import multiprocessing
+import logging
+from cachetools import TTLCache
+import msgspec
 
-from database import get_db, engine
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from database import get_db, engine, AsyncSessionLocal
 from models import Base, User, Pitch
 from schemas import UserCreate, UserLogin, UserResponse, PitchCreate, PitchResponse
 from auth import create_access_token, verify_token, get_password_hash, verify_password
 from file_storage import storage
-from speech_to_text import transcribe_audio
+from speech_to_text import transcribe_audio, warm_up as warm_up_transcription
+
+logger = logging.getLogger(__name__)
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Pitch Recording API", version="1.0.0")
+# create_all skips tables that already exist, so add indexes introduced
+# after a database was first created
+for index in Pitch.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+
+# bcrypt hashing is pure CPU work; run it in worker processes so it
+# doesn't block the event loop while other requests are waiting.
+# Workers start lazily, after the transcription threads are running, so
+# they come from a forkserver (spawn on Windows) instead of forking this
+# multi-threaded process.
+password_pool = ProcessPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1),
+    mp_context=multiprocessing.get_context(
+        "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    )
+)
+
+def raise_file_descriptor_limit():
+    # Each open connection holds a file descriptor; allow up to the hard limit
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    raise_file_descriptor_limit()
+    warm_up_transcription()
+    yield
+    password_pool.shutdown()
+
+app = FastAPI(title="Pitch Recording API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -37,6 +86,46 @@ security = HTTPBearer()
 uploads_dir = Path("uploads")
 uploads_dir.mkdir(exist_ok=True)
 
+class MsgspecJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return msgspec.json.encode(content)
+
+# msgspec structs aren't visible to FastAPI's schema generation, so the
+# pitch endpoints declare their response schemas explicitly
+(pitch_schema, pitch_list_schema), pitch_schema_components = msgspec.json.schema_components(
+    [PitchResponse, list[PitchResponse]],
+    ref_template="#/components/schemas/{name}"
+)
+
+def json_response_doc(schema: dict) -> dict:
+    return {200: {"content": {"application/json": {"schema": schema}}}}
+
+class AudioFileResponse(FileResponse):
+    # Larger reads than Starlette's 64 KiB default when the server can't use
+    # sendfile, so multi-megabyte recordings take fewer trips through Python
+    chunk_size = 1024 * 1024
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match may list several tags, weak ones prefixed with W/
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+_default_openapi = app.openapi
+
+def openapi():
+    # Add the msgspec components referenced by the pitch endpoint schemas
+    if app.openapi_schema is None:
+        schema = _default_openapi()
+        schema.setdefault("components", {}).setdefault("schemas", {}).update(pitch_schema_components)
+    return app.openapi_schema
+
+app.openapi = openapi
+
 @app.get("/")
 async def root():
     return {"message": "Pitch Recording API"}
@@ -52,28 +141,35 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    loop = asyncio.get_running_loop()
+    hashed_password = await loop.run_in_executor(password_pool, get_password_hash, user.password)
     db_user = User(
         email=user.email,
         username=user.username,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
-    return UserResponse(
+    # flush() assigns the id and created_at default; build the response
+    # before commit() expires them so no reload SELECT is needed
+    db.flush()
+    response = UserResponse(
         id=db_user.id,
         email=db_user.email,
         username=db_user.username,
         created_at=db_user.created_at
     )
+    db.commit()
+    
+    return response
 
 @app.post("/login")
 async def login(user: UserLogin, db: Session = Depends(get_db)):
     # Authenticate user
     db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    loop = asyncio.get_running_loop()
+    if not db_user or not await loop.run_in_executor(
+        password_pool, verify_password, user.password, db_user.hashed_password
+    ):
         raise HTTPException(
             status_code=401,
             detail="Invalid credentials"
@@ -93,9 +189,12 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
         )
     }
 
+# Recently authenticated users by email, so authenticated requests don't
+# each need a user lookup
+user_cache = TTLCache(maxsize=10_000, ttl=60)
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     token = credentials.credentials
     email = verify_token(token)
@@ -105,16 +204,23 @@ async def get_current_user(
             detail="Invalid token"
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    user = user_cache.get(email)
     if user is None:
-        raise HTTPException(
-            status_code=401,
-            detail="User not found"
-        )
+        # Async session so the lookup suspends instead of blocking the loop;
+        # the user is detached (with its columns loaded) once it closes
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(User).where(User.email == email))
+            user = result.scalar_one_or_none()
+        if user is None:
+            raise HTTPException(
+                status_code=401,
+                detail="User not found"
+            )
+        user_cache[email] = user
     
     return user
 
-@app.post("/pitches", response_model=PitchResponse)
+@app.post("/pitches", response_class=MsgspecJSONResponse, responses=json_response_doc(pitch_schema))
 async def create_pitch(
     title: str = Form(...),
     description: str = Form(""),
@@ -122,12 +228,10 @@ async def create_pitch(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Read audio file content
-    audio_content = await audio_file.read()
-    
-    # Save audio file using storage system
+    # Save audio file using storage system, copying the upload in chunks
+    # instead of reading it into memory at once
     try:
-        file_path = await storage.save_audio_file(audio_content, audio_file.filename or "recording.wav")
+        file_path = await storage.save_audio_fileobj(audio_file.file, audio_file.filename or "recording.wav")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save audio file: {str(e)}")
     
@@ -135,7 +239,10 @@ async def create_pitch(
     try:
         transcript = await transcribe_audio(file_path)
     except Exception as e:
+        logger.exception("Transcription failed for %s", file_path)
         transcript = f"Transcription failed: {str(e)}"
+    if transcript is None:
+        transcript = "No speech detected in the audio recording."
     
     # Create pitch record
     db_pitch = Pitch(
@@ -146,10 +253,9 @@ async def create_pitch(
         user_id=current_user.id
     )
     db.add(db_pitch)
-    db.commit()
-    db.refresh(db_pitch)
-    
-    return PitchResponse(
+    # Same as register: read the flushed values before commit() expires them
+    db.flush()
+    response = PitchResponse(
         id=db_pitch.id,
         title=db_pitch.title,
         description=db_pitch.description,
@@ -157,26 +263,28 @@ async def create_pitch(
         created_at=db_pitch.created_at,
         user_id=db_pitch.user_id
     )
+    db.commit()
+    
+    return MsgspecJSONResponse(response)
 
-@app.get("/pitches", response_model=list[PitchResponse])
+@app.get("/pitches", response_class=MsgspecJSONResponse, responses=json_response_doc(pitch_list_schema))
 async def get_pitches(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    pitches = db.query(Pitch).filter(Pitch.user_id == current_user.id).all()
-    return [
-        PitchResponse(
-            id=pitch.id,
-            title=pitch.title,
-            description=pitch.description,
-            transcript=pitch.transcript,
-            created_at=pitch.created_at,
-            user_id=pitch.user_id
-        )
-        for pitch in pitches
-    ]
+    # Select only the response columns; skips ORM hydration and the
+    # audio_file_path column the list view never needs
+    stmt = select(
+        Pitch.id,
+        Pitch.title,
+        Pitch.description,
+        Pitch.transcript,
+        Pitch.created_at,
+        Pitch.user_id
+    ).where(Pitch.user_id == current_user.id)
+    return MsgspecJSONResponse([PitchResponse(**row) for row in db.execute(stmt).mappings()])
 
-@app.get("/pitches/{pitch_id}", response_model=PitchResponse)
+@app.get("/pitches/{pitch_id}", response_class=MsgspecJSONResponse, responses=json_response_doc(pitch_schema))
 async def get_pitch(
     pitch_id: int,
     current_user: User = Depends(get_current_user),
@@ -193,18 +301,19 @@ async def get_pitch(
             detail="Pitch not found"
         )
     
-    return PitchResponse(
+    return MsgspecJSONResponse(PitchResponse(
         id=pitch.id,
         title=pitch.title,
         description=pitch.description,
         transcript=pitch.transcript,
         created_at=pitch.created_at,
         user_id=pitch.user_id
-    )
+    ))
 
 @app.get("/audio/{pitch_id}")
 async def get_audio(
     pitch_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -219,18 +328,39 @@ async def get_audio(
             detail="Pitch not found"
         )
     
-    if not Path(pitch.audio_file_path).exists():
+    try:
+        stat_result = os.stat(pitch.audio_file_path)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=404,
             detail="Audio file not found"
         )
     
-    return FileResponse(
+    # Let the player revalidate instead of downloading the file again
+    etag = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"etag": etag})
+    
+    return AudioFileResponse(
         pitch.audio_file_path,
         media_type="audio/wav",
-        filename=f"pitch_{pitch_id}.wav"
+        filename=f"pitch_{pitch_id}.wav",
+        stat_result=stat_result,
+        headers={"etag": etag}
     )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Workers need the app as an import string; "auto" picks uvloop and
+    # httptools when installed (uvicorn[standard], except uvloop on Windows).
+    # Every worker loads its own Whisper model and splits the cores between
+    # its transcriptions, so a single worker is the default (see .env).
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WORKERS", "1")),
+        loop="auto",
+        http="auto",
+        backlog=4096
+    )
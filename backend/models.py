@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -28,3 +28,6 @@ class Pitch(Base):
     
     # Relationship
     user = relationship("User", back_populates="pitches")
+    
+    # Every pitch lookup filters by owner, optionally with the pitch id
+    __table_args__ = (Index("ix_pitch_user_id_id", "user_id", "id"),)
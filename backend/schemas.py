@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
+import msgspec
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Optional
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -24,13 +25,14 @@ class PitchCreate(BaseModel):
     title: str
     description: Optional[str] = ""
 
-class PitchResponse(BaseModel):
+# Built from trusted database rows and returned in lists, so it skips
+# Pydantic validation and is encoded directly with msgspec
+class PitchResponse(msgspec.Struct):
     id: int
     title: str
     description: str
     transcript: str
-    created_at: datetime
+    # Naive datetimes carry no format in msgspec's schema; keep the one
+    # Pydantic documented
+    created_at: Annotated[datetime, msgspec.Meta(extra_json_schema={"format": "date-time"})]
     user_id: int
-    
-    class Config:
-        from_attributes = True
@@ -1,12 +1,27 @@
 import asyncio
-import whisper
+import logging
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from faster_whisper.vad import get_speech_timestamps
 from pathlib import Path
 import os
+import threading
+from typing import Optional
 from dotenv import load_dotenv
-import torch
+import ctranslate2
+import numpy as np
 
 load_dotenv()
 
+# Per-request messages go through logging with lazy %-formatting, so they
+# cost nothing unless the level is enabled
+logger = logging.getLogger(__name__)
+
+# Check if CUDA is available for faster processing
+device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+# Language of the recordings ("en", "fr", ...); unset means auto-detect
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE") or None
+
 # Initialize Whisper model
 # Available models: tiny, base, small, medium, large
 # tiny: fastest, least accurate (~39 MB)
@@ -14,64 +29,157 @@ load_dotenv()
 # small: better accuracy (~244 MB)
 # medium: high accuracy (~769 MB)
 # large: best accuracy (~1550 MB)
+# English-only variants (tiny.en, distil-small.en, ...) are faster for the
+# same accuracy on English; distil-* models are distilled for speed on GPU.
+# Without WHISPER_MODEL_SIZE the default depends on hardware and language:
+# English on GPU -> distil-small.en, English on CPU -> tiny.en (~3x faster
+# than base, slightly higher error rate), otherwise the multilingual base.
 
-WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
-print(f"Loading Whisper model: {WHISPER_MODEL_SIZE}")
+def _default_model_size() -> str:
+    if WHISPER_LANGUAGE == "en":
+        return "distil-small.en" if device == "cuda" else "tiny.en"
+    return "base"
 
-try:
-    # Load the model once at startup
-    whisper_model = whisper.load_model(WHISPER_MODEL_SIZE)
-    print(f"✅ Whisper model '{WHISPER_MODEL_SIZE}' loaded successfully")
-    
-    # Check if CUDA is available for faster processing
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    print(f"Using device: {device}")
-    
-except Exception as e:
-    print(f"❌ Error loading Whisper model: {e}")
-    whisper_model = None
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE") or _default_model_size()
+
+# float16 runs the matmuls on GPU tensor cores; on CPU, int8 weights use
+# CTranslate2's quantized integer GEMM kernels
+WHISPER_COMPUTE_TYPE = os.getenv(
+    "WHISPER_COMPUTE_TYPE",
+    "float16" if device == "cuda" else "int8"
+)
 
-async def transcribe_audio(audio_file_path: str) -> str:
+# Number of 30 s audio windows decoded together in one forward pass
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "16" if device == "cuda" else "8"))
+
+# Transcriptions the model can run in parallel, and CPU threads for each.
+# Splitting the cores between workers avoids oversubscribing them when
+# several recordings are transcribed at once.
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "2"))
+WHISPER_CPU_THREADS = int(os.getenv(
+    "WHISPER_CPU_THREADS",
+    str(max(1, (os.cpu_count() or 1) // WHISPER_NUM_WORKERS))
+))
+
+# Silero VAD speech probability above which a frame counts as speech.
+# Unset keeps the batched pipeline's own VAD settings (threshold 0.5).
+WHISPER_VAD_THRESHOLD = (
+    float(os.getenv("WHISPER_VAD_THRESHOLD"))
+    if os.getenv("WHISPER_VAD_THRESHOLD") else None
+)
+
+# Loaded models keyed by (size, device, compute type). Models are loaded on
+# first use rather than at import, and shared by every caller in the process.
+_models = {}
+_models_lock = threading.Lock()
+
+def get_whisper_model(model_size: str = WHISPER_MODEL_SIZE):
     """
-    Transcribe audio file using OpenAI Whisper (local model)
+    Return the shared batched Whisper pipeline, loading it on first use
+    Returns None if the model could not be loaded
     """
-    if not whisper_model:
-        return await mock_transcribe_audio(audio_file_path)
-    
+    key = _model_key(model_size)
+    if key not in _models:
+        with _models_lock:
+            if key not in _models:
+                _models[key] = _load_model(model_size)
+    return _models[key]
+
+async def _get_whisper_model_async():
+    # Only the first load is slow enough to need a worker thread; a cached
+    # model (or cached failure) is returned straight from the event loop
+    key = _model_key(WHISPER_MODEL_SIZE)
+    if key in _models:
+        return _models[key]
+    return await asyncio.to_thread(get_whisper_model)
+
+def _model_key(model_size: str) -> tuple:
+    return (model_size, device, WHISPER_COMPUTE_TYPE)
+
+def warm_up():
+    """
+    Load the model and run it once in a background thread, so the first
+    real transcription doesn't pay for weight loading and kernel setup
+    """
+    threading.Thread(target=_warm_up, daemon=True).start()
+
+def _warm_up():
+    whisper_model = get_whisper_model()
+    if whisper_model is None:
+        return
+    # Build the Silero VAD session, then skip it and call the underlying model
+    # directly, since VAD would drop pure silence before the encoder; Whisper
+    # pads the second of silence to a full 30 s window
+    silence = np.zeros(16000, dtype=np.float32)
+    get_speech_timestamps(silence)
+    segments, _ = whisper_model.model.transcribe(
+        silence,
+        language=WHISPER_LANGUAGE or "en",
+        beam_size=1,
+        vad_filter=False
+    )
+    list(segments)
+
+def _load_model(model_size: str):
+    print(f"Loading Whisper model: {model_size}")
     try:
-        # Check if file exists
-        if not Path(audio_file_path).exists():
-            return "Error: Audio file not found"
-        
-        print(f"Transcribing audio file: {audio_file_path}")
-        
-        # Run Whisper transcription in a thread to avoid blocking
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None, 
-            whisper_model.transcribe, 
-            audio_file_path
+        model = WhisperModel(
+            model_size,
+            device=device,
+            compute_type=WHISPER_COMPUTE_TYPE,
+            cpu_threads=WHISPER_CPU_THREADS,
+            num_workers=WHISPER_NUM_WORKERS
         )
-        
-        # Extract the transcribed text
-        transcript = result["text"].strip()
-        
-        if transcript:
-            print(f"✅ Transcription completed: {len(transcript)} characters")
-            return transcript
-        else:
-            return "No speech detected in the audio recording."
-            
+        print(f"✅ Whisper model '{model_size}' loaded successfully")
+        print(f"Using device: {device} ({WHISPER_COMPUTE_TYPE})")
+        # Splits the audio on speech boundaries and decodes the windows in
+        # batches instead of one after another
+        return BatchedInferencePipeline(model)
     except Exception as e:
-        error_msg = f"Transcription error: {str(e)}"
-        print(f"❌ {error_msg}")
-        return error_msg
+        print(f"❌ Error loading Whisper model: {e}")
+        return None
+
+async def transcribe_audio(audio_file_path: str) -> Optional[str]:
+    """
+    Transcribe audio file using Whisper (local faster-whisper model)
+    Returns None if no speech was detected; raises if transcription fails
+    """
+    # Loading blocks, so the first call does it in a worker thread
+    whisper_model = await _get_whisper_model_async()
+    if not whisper_model:
+        return await mock_transcribe_audio(audio_file_path)
+    
+    # Check if file exists
+    if not Path(audio_file_path).exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
+    
+    logger.debug("Transcribing audio file: %s", audio_file_path)
+    
+    # Run Whisper transcription in a thread to avoid blocking
+    segments, _ = await asyncio.to_thread(
+        _transcribe_file,
+        whisper_model,
+        audio_file_path,
+        language=WHISPER_LANGUAGE,
+        beam_size=1,
+        temperature=0.0,
+        condition_on_previous_text=False
+    )
+    
+    # Extract the transcribed text
+    transcript = "".join(segment.text for segment in segments).strip()
+    if not transcript:
+        return None
+    
+    logger.debug("Transcription completed: %d characters", len(transcript))
+    return transcript
 
 async def transcribe_audio_with_options(audio_file_path: str, language: str = None) -> dict:
     """
     Advanced transcription with additional options
     Returns detailed result including confidence and timing
     """
+    whisper_model = await _get_whisper_model_async()
     if not whisper_model:
         return {
             "text": await mock_transcribe_audio(audio_file_path),
@@ -87,36 +195,77 @@ async def transcribe_audio_with_options(audio_file_path: str, language: str = No
                 "confidence": 0.0
             }
         
-        print(f"Advanced transcribing: {audio_file_path}")
+        logger.debug("Advanced transcribing: %s", audio_file_path)
         
         # Transcribe with language detection and additional options
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: whisper_model.transcribe(
-                audio_file_path,
-                language=language,
-                word_timestamps=True,
-                fp16=False  # Use fp32 for better compatibility
-            )
+        segments, info = await asyncio.to_thread(
+            _transcribe_file,
+            whisper_model,
+            audio_file_path,
+            language=language or WHISPER_LANGUAGE,
+            word_timestamps=True
         )
+        segments = [_segment_to_dict(segment) for segment in segments]
         
         return {
-            "text": result["text"].strip(),
-            "language": result.get("language", "unknown"),
-            "confidence": calculate_average_confidence(result.get("segments", [])),
-            "segments": result.get("segments", [])
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "language": info.language or "unknown",
+            "confidence": calculate_average_confidence(segments),
+            "segments": segments
         }
         
     except Exception as e:
-        error_msg = f"Advanced transcription error: {str(e)}"
-        print(f"❌ {error_msg}")
+        logger.error("Advanced transcription error: %s", e)
         return {
-            "text": error_msg,
+            "text": f"Advanced transcription error: {str(e)}",
             "language": "unknown",
             "confidence": 0.0
         }
 
+def _transcribe_file(whisper_model, audio_file_path: str, **options):
+    """
+    Run faster-whisper and return (segments, info)
+    Segments are decoded lazily, so they are consumed here in the worker
+    thread rather than on the event loop
+    """
+    vad_parameters = None
+    if WHISPER_VAD_THRESHOLD is not None:
+        # Passing any VAD parameters replaces the pipeline's defaults, so
+        # keep its 160 ms minimum silence rather than VadOptions' 2 s
+        vad_parameters = {
+            "threshold": WHISPER_VAD_THRESHOLD,
+            "min_silence_duration_ms": 160
+        }
+    segments, info = whisper_model.transcribe(
+        audio_file_path,
+        batch_size=WHISPER_BATCH_SIZE,
+        vad_parameters=vad_parameters,
+        **options
+    )
+    return list(segments), info
+
+def _segment_to_dict(segment) -> dict:
+    """Convert a faster-whisper segment to the openai-whisper dict layout"""
+    result = {
+        "id": segment.id,
+        "start": segment.start,
+        "end": segment.end,
+        "text": segment.text,
+        "avg_logprob": segment.avg_logprob,
+        "no_speech_prob": segment.no_speech_prob
+    }
+    if segment.words:
+        result["words"] = [
+            {
+                "word": word.word,
+                "start": word.start,
+                "end": word.end,
+                "probability": word.probability
+            }
+            for word in segment.words
+        ]
+    return result
+
 def calculate_average_confidence(segments):
     """Calculate average confidence from segments"""
     if not segments:
@@ -140,4 +289,4 @@ async def mock_transcribe_audio(audio_file_path: str) -> str:
     Mock transcription for development purposes
     """
     await asyncio.sleep(1)  # Simulate processing time
-    return "This is a mock transcription. Install Whisper with 'pip install openai-whisper' to enable local speech-to-text transcription."
+    return "This is a mock transcription. Install Whisper with 'pip install faster-whisper' to enable local speech-to-text transcription."